@@ -10,7 +10,6 @@ import pyaudio
 import struct
 import time
 import collections
-from threading import Thread, Lock
 
 # Try to import opuslib, but continue without it if not available
 try:
@@ -21,9 +20,14 @@ except:
     print("⚠️  Opus library not available - will only support raw audio")
 
 PORT = 5555
+SOCKET_RCVBUF = 1 << 20  # Absorb bursts (e.g. Wi-Fi retries) without kernel drops
 HEADER_MAGIC = b"SYNC"
 PROTOCOL_VERSION = 1
 
+# Wire formats, compiled once (see parse_header / parse_audio_packet)
+HEADER_STRUCT = struct.Struct('<4sBIHB')  # magic, version, sample_rate, channels, compression
+AUDIO_PACKET_STRUCT = struct.Struct('<BQH')  # type, timestamp_us, size
+
 # Packet types
 PACKET_TYPE_RAW = 0
 PACKET_TYPE_OPUS = 1
@@ -33,39 +37,35 @@ JITTER_BUFFER_SIZE = 10  # Number of packets to buffer
 JITTER_BUFFER_MIN = 3    # Minimum packets before starting playback
 
 class JitterBuffer:
-    """Simple jitter buffer to smooth out network variations"""
+    """Simple jitter buffer to smooth out network variations
+    
+    Lock-free for one producer and one consumer: deque.append and
+    deque.popleft are atomic. When full, append overwrites the oldest
+    packet, so a lagging consumer loses the stalest audio first.
+    """
     def __init__(self, size=JITTER_BUFFER_SIZE):
         self.buffer = collections.deque(maxlen=size)
-        self.lock = Lock()
         
     def add(self, data):
-        with self.lock:
-            self.buffer.append(data)
+        self.buffer.append(data)
     
     def get(self):
-        with self.lock:
-            if len(self.buffer) >= JITTER_BUFFER_MIN:
-                return self.buffer.popleft()
-            return None
+        if len(self.buffer) >= JITTER_BUFFER_MIN:
+            return self.buffer.popleft()
+        return None
     
     def size(self):
-        with self.lock:
-            return len(self.buffer)
+        return len(self.buffer)
 
 def parse_header(data):
     """Parse header packet: [MAGIC][VERSION][SAMPLE_RATE][CHANNELS][COMPRESSION]"""
-    if len(data) < 12:
+    if len(data) < HEADER_STRUCT.size:
         return None
     
-    magic = data[:4]
+    magic, version, sample_rate, channels, compression = HEADER_STRUCT.unpack_from(data)
     if magic != HEADER_MAGIC:
         return None
     
-    version = data[4]
-    sample_rate = struct.unpack('<I', data[5:9])[0]
-    channels = struct.unpack('<H', data[9:11])[0]
-    compression = data[11]
-    
     return {
         'version': version,
         'sample_rate': sample_rate,
@@ -76,13 +76,11 @@ def parse_header(data):
 
 def parse_audio_packet(data):
     """Parse audio packet: [TYPE][TIMESTAMP][SIZE][DATA]"""
-    if len(data) < 11:
+    if len(data) < AUDIO_PACKET_STRUCT.size:
         return None
     
-    packet_type = data[0]
-    timestamp = struct.unpack('<Q', data[1:9])[0]
-    size = struct.unpack('<H', data[9:11])[0]
-    audio_data = data[11:11+size]
+    packet_type, timestamp, size = AUDIO_PACKET_STRUCT.unpack_from(data)
+    audio_data = data[AUDIO_PACKET_STRUCT.size:AUDIO_PACKET_STRUCT.size + size]
     
     return {
         'type': packet_type,
@@ -100,16 +98,22 @@ print("Features: Opus codec, Jitter buffer, Latency measurement\n")
 
 # Setup UDP Socket
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_RCVBUF)
 sock.bind(("0.0.0.0", PORT))
 
+# One receive buffer for the whole session; payloads are copied out before it is reused.
+# 64 KiB holds any UDP datagram, so large raw packets arriving before the header fit too
+recv_buffer = bytearray(65536)
+recv_view = memoryview(recv_buffer)
+
 # Wait for header packet
 print("⏳ Waiting for configuration header...")
 config = None
 audio_packet_count = 0
 
 while config is None:
-    data, addr = sock.recvfrom(8192)
-    config = parse_header(data)
+    nbytes, addr = sock.recvfrom_into(recv_buffer)
+    config = parse_header(recv_view[:nbytes])
     if config:
         print(f"✅ Config received from {addr}:")
         print(f"   Protocol Version: {config['version']}")
@@ -138,6 +142,30 @@ if config['compression'] == 1:
         print("⚠️  Compression enabled but Opus library not available")
         print("   Install Opus library to enable compression support")
 
+# Initialize jitter buffer
+jitter_buffer = JitterBuffer(JITTER_BUFFER_SIZE)
+
+# Playback runs in PortAudio's callback thread; the receive loop below only fills the jitter buffer
+bytes_per_frame = config['channels'] * 4  # float32
+pending_audio = bytearray()
+silence = b''  # Reused on every underrun; rebuilt only if the host changes the block size
+
+def playback_callback(in_data, frame_count, time_info, status):
+    """Feed PortAudio from the jitter buffer, playing silence on underrun"""
+    global silence
+    needed = frame_count * bytes_per_frame
+    while len(pending_audio) < needed:
+        audio_data = jitter_buffer.get()
+        if audio_data is None:
+            if len(silence) != needed:
+                silence = bytes(needed)
+            return silence, pyaudio.paContinue
+        pending_audio.extend(audio_data)
+    
+    out = bytes(memoryview(pending_audio)[:needed])  # Single copy out of the pending bytes
+    del pending_audio[:needed]
+    return out, pyaudio.paContinue
+
 # Initialize PyAudio
 p = pyaudio.PyAudio()
 stream = p.open(
@@ -145,12 +173,12 @@ stream = p.open(
     channels=config['channels'],
     rate=config['sample_rate'],
     output=True,
-    frames_per_buffer=2048
+    # Let the host pick its native period: a fixed 2048-frame block would drain several
+    # small sender packets per callback and outrun the packet-counted jitter buffer
+    frames_per_buffer=pyaudio.paFramesPerBufferUnspecified,
+    stream_callback=playback_callback
 )
 
-# Initialize jitter buffer
-jitter_buffer = JitterBuffer(JITTER_BUFFER_SIZE)
-
 print(f"🔊 Playing audio with jitter buffer ({JITTER_BUFFER_SIZE} packets)...\n")
 
 # Statistics
@@ -158,15 +186,21 @@ packet_count = 0
 bytes_received = 0
 total_latency_us = 0
 latency_count = 0
+decode_errors = 0
 start_time = time.time()
 last_report = start_time
 
+# Session constants, hoisted out of the per-packet loop
+sample_rate = config['sample_rate']
+uncompressed_bps = sample_rate * config['channels'] * 32 if config['compression'] == 1 else 0  # bits
+
 try:
     while True:
-        data, addr = sock.recvfrom(65536)
+        nbytes, addr = sock.recvfrom_into(recv_buffer)
+        data = recv_view[:nbytes]
         
         # Skip header packets
-        if len(data) == 12 and data[:4] == HEADER_MAGIC:
+        if nbytes == 12 and data[:4] == HEADER_MAGIC:
             continue
         
         # Parse audio packet
@@ -175,34 +209,32 @@ try:
             continue
         
         packet_count += 1
-        bytes_received += len(data)
+        bytes_received += nbytes
         
-        # Calculate latency
+        # Calculate latency (one clock read per packet, reused for the stats report)
         receive_time = get_timestamp_us()
+        now = receive_time / 1_000_000
         latency_us = receive_time - packet['timestamp']
         total_latency_us += latency_us
         latency_count += 1
         
         # Decode if needed
-        if packet['type'] == PACKET_TYPE_OPUS and decoder:
+        if decoder and packet['type'] == PACKET_TYPE_OPUS:
             try:
                 # Decode Opus to PCM
-                pcm_data = decoder.decode_float(packet['data'], config['sample_rate'], decode_fec=False)
+                pcm_data = decoder.decode_float(bytes(packet['data']), sample_rate, decode_fec=False)
                 jitter_buffer.add(pcm_data.tobytes())
             except Exception as e:
-                print(f"⚠️  Opus decode error: {e}")
+                # Report the first failure; later ones are only counted (see the stats line)
+                decode_errors += 1
+                if decode_errors == 1:
+                    print(f"⚠️  Opus decode error: {e}")
                 continue
         else:
-            # Raw audio data
-            jitter_buffer.add(packet['data'])
-        
-        # Play from jitter buffer
-        audio_data = jitter_buffer.get()
-        if audio_data:
-            stream.write(audio_data)
+            # Raw audio data (copied: the view points into recv_buffer)
+            jitter_buffer.add(bytes(packet['data']))
         
         # Report stats every 2 seconds
-        now = time.time()
         if now - last_report >= 2.0:
             elapsed = now - start_time
             kbps = (bytes_received * 8) / (elapsed * 1000)
@@ -210,8 +242,7 @@ try:
             buffer_fill = jitter_buffer.size()
             
             compression_ratio = 0
-            if config['compression'] == 1:
-                uncompressed_bps = config['sample_rate'] * config['channels'] * 32  # bits
+            if uncompressed_bps:
                 compression_ratio = (kbps * 1000) / uncompressed_bps * 100
             
             print(f"📦 Packets: {packet_count:6d} | "
@@ -220,9 +251,10 @@ try:
                   f"Buffer: {buffer_fill}/{JITTER_BUFFER_SIZE}", end="")
             
             if compression_ratio > 0:
-                print(f" | Compression: {compression_ratio:.1f}%")
-            else:
-                print()
+                print(f" | Compression: {compression_ratio:.1f}%", end="")
+            if decode_errors:
+                print(f" | Decode errors: {decode_errors}", end="")
+            print()
             
             last_report = now
 
@@ -236,6 +268,8 @@ except KeyboardInterrupt:
     print(f"   Total data: {bytes_received/1024/1024:.2f} MB")
     print(f"   Average bitrate: {(bytes_received * 8) / (elapsed * 1000):.1f} kbps")
     print(f"   Average latency: {avg_latency_ms:.2f} ms")
+    if decode_errors:
+        print(f"   Decode errors: {decode_errors}")
     print(f"   Duration: {elapsed:.1f}s")
 finally:
     stream.stop_stream()
@@ -9,20 +9,21 @@ import time
 
 PORT = 5555
 HEADER_MAGIC = b"SYNC"
+HEADER_STRUCT = struct.Struct('<4sBIHB')  # magic, version, sample_rate, channels, compression
+
+def is_header(data):
+    """Header datagrams have a fixed size and magic; everything else is audio"""
+    return len(data) == HEADER_STRUCT.size and data[:4] == HEADER_MAGIC
 
 def parse_header(data):
-    """Parse header packet: [MAGIC][SAMPLE_RATE][CHANNELS]"""
-    if len(data) < 10:
-        return None
-    
-    magic = data[:4]
-    if magic != HEADER_MAGIC:
+    """Parse header packet: [MAGIC][VERSION][SAMPLE_RATE][CHANNELS][COMPRESSION]"""
+    if not is_header(data):
         return None
     
-    sample_rate = struct.unpack('<I', data[4:8])[0]
-    channels = struct.unpack('<H', data[8:10])[0]
+    magic, version, sample_rate, channels, compression = HEADER_STRUCT.unpack_from(data)
     
     return {
+        'version': version,
         'sample_rate': sample_rate,
         'channels': channels
     }
@@ -33,6 +34,11 @@ print("(Audio packets are received but NOT played - prevents feedback loop)\n")
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 sock.bind(("0.0.0.0", PORT))
 
+# Payloads are only counted, so every packet (header wait included) is read into the same
+# buffer; 64 KiB holds any UDP datagram, where a smaller one fails on large raw packets
+recv_buffer = bytearray(65536)
+recv_view = memoryview(recv_buffer)
+
 # Wait for header
 print("⏳ Waiting for configuration header...")
 print("   TIP: Start the server AFTER starting this receiver\n")
@@ -40,8 +46,8 @@ config = None
 audio_packet_count = 0
 
 while config is None:
-    data, addr = sock.recvfrom(8192)
-    config = parse_header(data)
+    nbytes, addr = sock.recvfrom_into(recv_buffer)
+    config = parse_header(recv_view[:nbytes])
     if config:
         print(f"✅ Config received from {addr}:")
         print(f"   Sample Rate: {config['sample_rate']} Hz")
@@ -53,8 +59,8 @@ while config is None:
         # Received audio data before header
         audio_packet_count += 1
         if audio_packet_count == 1:
-            print(f"⚠️  Receiving audio packets (size: {len(data)} bytes)")
-            print(f"   Waiting for header packet (10 bytes with 'SYNC' magic)...")
+            print(f"⚠️  Receiving audio packets (size: {nbytes} bytes)")
+            print(f"   Waiting for header packet ({HEADER_STRUCT.size} bytes with 'SYNC' magic)...")
         elif audio_packet_count % 100 == 0:
             print(f"   Still waiting... ({audio_packet_count} audio packets received)")
 
@@ -66,14 +72,14 @@ last_report = start_time
 
 try:
     while True:
-        data, addr = sock.recvfrom(8192)
+        nbytes = sock.recv_into(recv_buffer)
         
         # Skip header packets
-        if len(data) == 10 and data[:4] == HEADER_MAGIC:
+        if is_header(recv_view[:nbytes]):
             continue
         
         packet_count += 1
-        bytes_received += len(data)
+        bytes_received += nbytes
         
         # Report every 2 seconds
         now = time.time()
@@ -1,12 +1,26 @@
 ﻿use pyo3::prelude::*;
 use cpal::traits::{DeviceTrait, HostTrait, StreamTrait};
-use std::net::UdpSocket;
+use socket2::{SockAddr, SockRef};
+use std::io::IoSlice;
+use std::net::{SocketAddr, ToSocketAddrs, UdpSocket};
+use std::sync::{Condvar, Mutex};
 use std::thread;
 use std::time::{Duration, SystemTime, UNIX_EPOCH};
 
 const HEADER_MAGIC: &[u8; 4] = b"SYNC";
 const PROTOCOL_VERSION: u8 = 1;
 const PACKET_TYPE_RAW: u8 = 0;
+const PACKET_HEADER_LEN: usize = 11;
+// Largest IPv4 UDP payload; an audio packet (header + samples) must fit in one datagram
+const MAX_UDP_PAYLOAD: usize = 65507;
+// DSCP EF (Expedited Forwarding) << 2: lets WMM/QoS-aware routers queue audio as voice traffic
+const IP_TOS_EF: u32 = 0xB8;
+// Room for a burst of raw float32 packets to every target before sends start dropping
+const SEND_BUFFER_SIZE: usize = 1 << 20;
+
+// Bumped by stop_audio_server(); running servers wait on the condvar until it changes.
+static SERVER_GENERATION: Mutex<u64> = Mutex::new(0);
+static SERVER_STOP: Condvar = Condvar::new();
 
 fn as_u8_slice(v: &[f32]) -> &[u8] {
     unsafe {
@@ -14,45 +28,82 @@ fn as_u8_slice(v: &[f32]) -> &[u8] {
     }
 }
 
-fn send_header(socket: &UdpSocket, target_addr: &str, sample_rate: u32, channels: u16, use_compression: bool) -> Result<(), std::io::Error> {
-    let mut header = Vec::new();
-    header.extend_from_slice(HEADER_MAGIC);
-    header.push(PROTOCOL_VERSION);
-    header.extend_from_slice(&sample_rate.to_le_bytes());
-    header.extend_from_slice(&channels.to_le_bytes());
-    header.push(if use_compression { 1 } else { 0 });
-    socket.send_to(&header, target_addr)?;
-    println!(" Sent header: {}Hz, {} channels, compression: {}", sample_rate, channels, if use_compression { "Opus" } else { "Raw" });
-    Ok(())
+/// Encode the header once per session; it is resent from the audio callback, which must not allocate.
+fn build_header(sample_rate: u32, channels: u16, use_compression: bool) -> [u8; 12] {
+    let mut header = [0u8; 12];
+    header[0..4].copy_from_slice(HEADER_MAGIC);
+    header[4] = PROTOCOL_VERSION;
+    header[5..9].copy_from_slice(&sample_rate.to_le_bytes());
+    header[9..11].copy_from_slice(&channels.to_le_bytes());
+    header[11] = if use_compression { 1 } else { 0 };
+    header
 }
 
 fn get_timestamp_us() -> u64 {
     SystemTime::now().duration_since(UNIX_EPOCH).unwrap().as_micros() as u64
 }
 
-fn build_packet(packet_type: u8, data: &[u8]) -> Vec<u8> {
-    let mut packet = Vec::with_capacity(1 + 8 + 2 + data.len());
-    packet.push(packet_type);
-    packet.extend_from_slice(&get_timestamp_us().to_le_bytes());
-    packet.extend_from_slice(&(data.len() as u16).to_le_bytes());
-    packet.extend_from_slice(data);
-    packet
+/// Encode an audio packet header: [TYPE][TIMESTAMP][SIZE]. The payload is sent next to it
+/// with a vectored send, so the audio is never copied into a packet buffer.
+fn build_packet_header(packet_type: u8, payload_len: usize) -> [u8; PACKET_HEADER_LEN] {
+    let mut header = [0u8; PACKET_HEADER_LEN];
+    header[0] = packet_type;
+    header[1..9].copy_from_slice(&get_timestamp_us().to_le_bytes());
+    header[9..11].copy_from_slice(&(payload_len as u16).to_le_bytes());
+    header
+}
+
+/// Stop every running audio server. Their start_* calls return once the stream is dropped.
+#[pyfunction]
+fn stop_audio_server() {
+    *SERVER_GENERATION.lock().unwrap() += 1;
+    SERVER_STOP.notify_all();
+}
+
+#[pyfunction]
+fn start_audio_server(py: Python, target_ip: String, target_port: u16, _use_compression: Option<bool>, broadcast: Option<bool>, buffer_frames: Option<u32>) -> PyResult<()> {
+    run_audio_server(py, vec![format!("{}:{}", target_ip, target_port)], broadcast.unwrap_or(false), buffer_frames)
 }
 
+/// Stream one capture to several targets. Each packet is built once and sent to every address,
+/// instead of opening a separate capture stream per target.
 #[pyfunction]
-fn start_audio_server(py: Python, target_ip: String, target_port: u16, _use_compression: Option<bool>, broadcast: Option<bool>) -> PyResult<()> {
+fn start_audio_server_multi(py: Python, targets: Vec<(String, u16)>, _use_compression: Option<bool>, buffer_frames: Option<u32>) -> PyResult<()> {
+    let target_addrs = targets.iter().map(|(ip, port)| format!("{}:{}", ip, port)).collect();
+    run_audio_server(py, target_addrs, false, buffer_frames)
+}
+
+/// `buffer_frames` requests a fixed capture period (e.g. 256 frames ~ 5 ms at 48 kHz);
+/// `None` keeps the device default, which is often far larger.
+fn run_audio_server(py: Python, target_addrs: Vec<String>, broadcast: bool, buffer_frames: Option<u32>) -> PyResult<()> {
     let use_compression = false;
-    let broadcast = broadcast.unwrap_or(false);
+    let generation = *SERVER_GENERATION.lock().unwrap();
+    
+    // Resolve once up front: send_to with a string re-parses (or DNS-resolves) it on every packet
+    let target_addrs: Vec<SocketAddr> = target_addrs.iter()
+        .map(|addr| addr.to_socket_addrs().ok().and_then(|mut addrs| addrs.next())
+            .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyOSError, _>(format!("Invalid target address: {}", addr))))
+        .collect::<PyResult<_>>()?;
     
     let socket = UdpSocket::bind("0.0.0.0:0").map_err(|e| PyErr::new::<pyo3::exceptions::PyOSError, _>(format!("Socket bind failed: {}", e)))?;
     
+    // Best-effort: some platforms (and Windows without QoS policy) ignore or reject IP_TOS
+    let sock = SockRef::from(&socket);
+    if let Err(e) = sock.set_tos(IP_TOS_EF) {
+        eprintln!(" Could not set IP_TOS: {}", e);
+    }
+    if let Err(e) = sock.set_send_buffer_size(SEND_BUFFER_SIZE) {
+        eprintln!(" Could not set SO_SNDBUF: {}", e);
+    }
+    
     if broadcast {
         socket.set_broadcast(true).map_err(|e| PyErr::new::<pyo3::exceptions::PyOSError, _>(format!("Broadcast enable failed: {}", e)))?;
         println!(" Broadcast mode enabled");
     }
     
-    let target_addr = format!("{}:{}", target_ip, target_port);
-    println!(" Streaming audio to: {}", target_addr);
+    for &target_addr in &target_addrs {
+        println!(" Streaming audio to: {}", target_addr);
+    }
 
     let host = cpal::default_host();
     let device = host.default_output_device().ok_or_else(|| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>("No output device found"))?;
@@ -60,12 +111,26 @@ fn start_audio_server(py: Python, target_ip: String, target_port: u16, _use_comp
     
     let sample_rate = default_config.sample_rate().0;
     let channels = default_config.channels();
-    let config: cpal::StreamConfig = default_config.into();
+    let mut config: cpal::StreamConfig = default_config.into();
+    if let Some(frames) = buffer_frames {
+        // Larger periods would overflow the u16 size field and exceed a UDP datagram,
+        // so every send would fail and no audio would go out
+        let max_frames = (MAX_UDP_PAYLOAD - PACKET_HEADER_LEN) / (channels as usize * std::mem::size_of::<f32>());
+        if frames == 0 || frames as usize > max_frames {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("buffer_frames must be between 1 and {} for {} channels, got {}", max_frames, channels, frames)));
+        }
+        config.buffer_size = cpal::BufferSize::Fixed(frames);
+    }
     
-    println!(" Device config: {} Hz, {} channels", sample_rate, channels);
+    println!(" Device config: {} Hz, {} channels, buffer: {:?}", sample_rate, channels, config.buffer_size);
+
+    let header = build_header(sample_rate, channels, use_compression);
+    println!(" Header: {}Hz, {} channels, compression: {}", sample_rate, channels, if use_compression { "Opus" } else { "Raw" });
 
     for _ in 0..5 {
-        send_header(&socket, &target_addr, sample_rate, channels, use_compression).map_err(|e| PyErr::new::<pyo3::exceptions::PyOSError, _>(format!("Header send failed: {}", e)))?;
+        for &target_addr in &target_addrs {
+            socket.send_to(&header, target_addr).map_err(|e| PyErr::new::<pyo3::exceptions::PyOSError, _>(format!("Header send failed: {}", e)))?;
+        }
         thread::sleep(Duration::from_millis(50));
     }
     
@@ -73,19 +138,28 @@ fn start_audio_server(py: Python, target_ip: String, target_port: u16, _use_comp
     thread::sleep(Duration::from_millis(100));
 
     let socket_clone = socket.try_clone().map_err(|e| PyErr::new::<pyo3::exceptions::PyOSError, _>(format!("Socket clone failed: {}", e)))?;
+    // The audio callback must never stall on a full send buffer; a WouldBlock just drops that packet
+    socket_clone.set_nonblocking(true).map_err(|e| PyErr::new::<pyo3::exceptions::PyOSError, _>(format!("Socket setup failed: {}", e)))?;
     let packet_counter = std::sync::Arc::new(std::sync::atomic::AtomicU64::new(0));
     let packet_counter_clone = packet_counter.clone();
+    let sock_addrs: Vec<SockAddr> = target_addrs.iter().map(|&addr| SockAddr::from(addr)).collect();
 
     let stream = device.build_input_stream(
         &config,
         move |data: &[f32], _: &_| {
+            let sock = SockRef::from(&socket_clone);
             let count = packet_counter_clone.fetch_add(1, std::sync::atomic::Ordering::Relaxed);
             if count % 1000 == 0 {
-                let _ = send_header(&socket_clone, &target_addr, sample_rate, channels, use_compression);
+                for addr in &sock_addrs {
+                    let _ = sock.send_to(&header, addr);
+                }
             }
             let byte_data = as_u8_slice(data);
-            let packet = build_packet(PACKET_TYPE_RAW, byte_data);
-            let _ = socket_clone.send_to(&packet, &target_addr);
+            let packet_header = build_packet_header(PACKET_TYPE_RAW, byte_data.len());
+            let bufs = [IoSlice::new(&packet_header), IoSlice::new(byte_data)];
+            for addr in &sock_addrs {
+                let _ = sock.send_to_vectored(&bufs, addr);
+            }
         },
         move |err| eprintln!("Stream error: {}", err),
         None
@@ -95,20 +169,23 @@ fn start_audio_server(py: Python, target_ip: String, target_port: u16, _use_comp
 
     println!(" Server running with timestamps & latency measurement");
     
-    // Release GIL and keep stream alive
+    // Release GIL and block until stop_audio_server() is called; the stream runs until dropped
     py.allow_threads(|| {
-        // Keep the stream alive by sleeping
-        // The stream will continue running until dropped
-        loop {
-            thread::sleep(Duration::from_millis(100));
+        let mut current = SERVER_GENERATION.lock().unwrap();
+        while *current == generation {
+            current = SERVER_STOP.wait(current).unwrap();
         }
     });
     
+    drop(stream);
+    println!(" Server stopped");
     Ok(())
 }
 
 #[pymodule]
 fn syncwave_core(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(start_audio_server, m)?)?;
+    m.add_function(wrap_pyfunction!(start_audio_server_multi, m)?)?;
+    m.add_function(wrap_pyfunction!(stop_audio_server, m)?)?;
     Ok(())
 }
@@ -12,18 +12,19 @@ Features:
 - Connection status monitoring
 """
 
+import argparse
 import customtkinter as ctk
 import threading
 import socket
+from concurrent.futures import ThreadPoolExecutor
 import json
+import logging
 import os
+from functools import partial
 from pathlib import Path
 import pyaudio
-import struct
 import time
-import collections
 from tkinter import messagebox
-import sys
 
 # Import Rust audio core
 try:
@@ -33,14 +34,12 @@ except ImportError:
     RUST_CORE_AVAILABLE = False
     messagebox.showerror("Error", "SyncWave Rust core not found! Please run: maturin develop")
 
+log = logging.getLogger("syncwave.ui")
+
 # Configuration
 CONFIG_FILE = Path.home() / ".syncwave" / "config.json"
 CONFIG_FILE.parent.mkdir(exist_ok=True)
 
-# Appearance
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("blue")
-
 class AudioMeter(ctk.CTkProgressBar):
     """Custom audio level meter widget"""
     def __init__(self, master, **kwargs):
@@ -59,25 +58,30 @@ class AudioMeter(ctk.CTkProgressBar):
         else:
             self.configure(progress_color="green")
 
-class JitterBuffer:
-    """Audio jitter buffer for smooth playback"""
-    def __init__(self, size=10):
-        self.buffer = collections.deque(maxlen=size)
-        self.lock = threading.Lock()
-    
-    def add(self, data):
-        with self.lock:
-            self.buffer.append(data)
-    
-    def get(self):
-        with self.lock:
-            if len(self.buffer) >= 3:
-                return self.buffer.popleft()
-            return None
-    
-    def size(self):
-        with self.lock:
-            return len(self.buffer)
+class TargetDeviceRow(ctk.CTkFrame):
+    """Multi-target list row: address label and remove button (recycled when removed)"""
+    def __init__(self, master, on_remove, font, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_remove = on_remove
+        self.address = None
+        
+        # Grid lays out the row in one pass: label stretches, button stays right
+        self.grid_columnconfigure(0, weight=1)
+        
+        self.label = ctk.CTkLabel(self, text="", anchor="w", font=font)
+        self.label.grid(row=0, column=0, padx=5, sticky="ew")
+        
+        self.remove_btn = ctk.CTkButton(self, text="❌", width=30, command=self.remove)
+        self.remove_btn.grid(row=0, column=1, padx=5)
+    
+    def assign(self, ip, port):
+        """Point this row at a target device"""
+        self.address = (ip, port)
+        self.label.configure(text=f"📍 {ip}:{port}")
+    
+    def remove(self):
+        """Remove button handler"""
+        self.on_remove(*self.address)
 
 class SyncWaveApp(ctk.CTk):
     """Main Application Window"""
@@ -101,9 +105,18 @@ class SyncWaveApp(ctk.CTk):
         self.pyaudio_instance = None
         self.audio_stream = None
         
+        # Device enumeration cache (WASAPI enumeration is slow)
+        self._device_cache = None
+        self._device_cache_ts = 0
+        self._scan_pending = False
+        
+        # Short-lived background jobs (device scans) share one worker
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="syncwave")
+        
         # UI Setup
         self.create_ui()
         self.apply_config()
+        self.start_device_scan()
         
     def load_config(self):
         """Load configuration from file"""
@@ -112,12 +125,14 @@ class SyncWaveApp(ctk.CTk):
                 "target_ip": "127.0.0.1",
                 "target_port": 5555,
                 "compression": False,
-                "broadcast": False
+                "broadcast": False,
+                "buffer_frames": None
             },
             "receiver": {
                 "listen_port": 5555,
                 "jitter_buffer_size": 10,
-                "buffer_frames": 2048
+                "buffer_frames": 2048,
+                "output_device": None
             },
             "appearance": {
                 "theme": "dark"
@@ -140,11 +155,104 @@ class SyncWaveApp(ctk.CTk):
             with open(CONFIG_FILE, 'w') as f:
                 json.dump(self.config, f, indent=4)
         except Exception as e:
-            print(f"Failed to save config: {e}")
+            log.error("Failed to save config: %s", e)
+    
+    def get_audio_devices_cached(self, ttl=5.0):
+        """Return output devices, enumerating at most once per ttl seconds"""
+        now = time.monotonic()
+        if self._device_cache is None or now - self._device_cache_ts >= ttl:
+            p = pyaudio.PyAudio()
+            try:
+                devices = []
+                for i in range(p.get_device_count()):
+                    info = p.get_device_info_by_index(i)
+                    if info['maxOutputChannels'] > 0:
+                        host_api = p.get_host_api_info_by_index(info['hostApi'])['name']
+                        devices.append({'index': i, 'name': info['name'], 'host_api': host_api})
+            finally:
+                p.terminate()
+            
+            self._device_cache = devices
+            self._device_cache_ts = now
+        
+        return self._device_cache
+    
+    def invalidate_device_cache(self):
+        """Force the next device query to re-enumerate (device added/removed)"""
+        self._device_cache = None
+    
+    def build_output_device_labels(self, devices):
+        """Build menu labels and the label -> (host API, device name) lookup"""
+        self.output_device_keys = {
+            f"{d['index']}: {d['name'][:50]}": (d['host_api'], d['name']) for d in devices
+        }
+        return list(self.output_device_keys)
+    
+    def refresh_output_devices(self):
+        """Re-scan audio devices and repopulate the output device menu"""
+        if self._scan_pending:
+            return
+        self.invalidate_device_cache()
+        self.start_device_scan()
+    
+    def start_device_scan(self):
+        """Enumerate devices in the background so the window stays responsive"""
+        # Coalesce requests: at most one scan in flight
+        if self._scan_pending:
+            return
+        self._scan_pending = True
+        self.refresh_devices_btn.configure(state="disabled")
+        self._executor.submit(self.scan_output_devices)
+    
+    def scan_output_devices(self):
+        """Background device enumeration; results are applied on the Tk thread"""
+        try:
+            devices = self.get_audio_devices_cached()
+        except Exception as e:
+            log.warning("Device scan failed: %s", e)
+            devices = []
+        self.after(0, self.apply_output_devices, devices)
+    
+    def apply_output_devices(self, devices):
+        """Populate the output device menu with scanned devices"""
+        self._scan_pending = False
+        self.refresh_devices_btn.configure(state="normal")
+        
+        output_devices = self.build_output_device_labels(devices)
+        log.debug("Device scan found %d output devices", len(output_devices))
+        
+        # configure(values=...) rebuilds the Tk menu; skip it when a rescan found the same devices
+        if output_devices != self._last_output_devices:
+            self.output_device_menu.configure(values=output_devices if output_devices else ["No devices found"])
+            self._last_output_devices = output_devices
+        
+        # Keep the current choice if it is still present, else restore the saved device
+        if self.output_device_var.get() in self.output_device_keys:
+            return
+        # Match by host API + name: PortAudio renumbers devices whenever one is added or
+        # removed, and the same endpoint appears under several host APIs with one name
+        saved_device = self.config["receiver"].get("output_device")
+        if isinstance(saved_device, dict):
+            saved_key = (saved_device.get("host_api"), saved_device.get("name"))
+            labels_by_key = {key: label for label, key in self.output_device_keys.items()}
+            if saved_key in labels_by_key:
+                self.output_device_var.set(labels_by_key[saved_key])
+                return
+        self.output_device_var.set(output_devices[0] if output_devices else "No devices found")
     
     def create_ui(self):
         """Create the user interface"""
         
+        # Shared fonts: each CTkFont wraps a Tk named font, so create them once
+        self.font_title = ctk.CTkFont(size=28, weight="bold")
+        self.font_heading = ctk.CTkFont(size=18, weight="bold")
+        self.font_button = ctk.CTkFont(size=16, weight="bold")
+        self.font_section = ctk.CTkFont(size=14, weight="bold")
+        self.font_body = ctk.CTkFont(size=14)
+        self.font_info = ctk.CTkFont(size=13)
+        self.font_small_bold = ctk.CTkFont(size=12, weight="bold")
+        self.font_small = ctk.CTkFont(size=12)
+        
         # Header
         header_frame = ctk.CTkFrame(self, fg_color="transparent")
         header_frame.pack(fill="x", padx=20, pady=10)
@@ -152,14 +260,14 @@ class SyncWaveApp(ctk.CTk):
         title_label = ctk.CTkLabel(
             header_frame,
             text="🎵 SyncWave Audio Sync",
-            font=ctk.CTkFont(size=28, weight="bold")
+            font=self.font_title
         )
         title_label.pack(side="left")
         
         version_label = ctk.CTkLabel(
             header_frame,
             text="v2.0",
-            font=ctk.CTkFont(size=12),
+            font=self.font_small,
             text_color="gray"
         )
         version_label.pack(side="left", padx=10)
@@ -190,14 +298,14 @@ class SyncWaveApp(ctk.CTk):
         ctk.CTkLabel(
             config_frame,
             text="Server Configuration",
-            font=ctk.CTkFont(size=18, weight="bold")
+            font=self.font_heading
         ).pack(pady=10)
         
         # Mode Selection
         mode_frame = ctk.CTkFrame(config_frame, fg_color="transparent")
         mode_frame.pack(pady=10, padx=20, fill="x")
         
-        ctk.CTkLabel(mode_frame, text="Streaming Mode:", font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w", pady=5)
+        ctk.CTkLabel(mode_frame, text="Streaming Mode:", font=self.font_section).pack(anchor="w", pady=5)
         
         self.server_mode_var = ctk.StringVar(value="single")
         
@@ -247,15 +355,15 @@ class SyncWaveApp(ctk.CTk):
         ctk.CTkLabel(
             self.multi_target_frame,
             text="Target Devices:",
-            font=ctk.CTkFont(size=12, weight="bold")
+            font=self.font_small_bold
         ).pack(anchor="w", pady=5)
         
         # Device list
         self.device_list_frame = ctk.CTkScrollableFrame(self.multi_target_frame, height=150)
         self.device_list_frame.pack(pady=5, fill="both", expand=True)
         
-        self.target_devices = []  # List to store (ip, port) tuples
-        self.device_labels = []   # List to store label widgets
+        self.target_devices = {}  # (ip, port) -> row frame, in insertion order
+        self._device_row_pool = []  # hidden rows kept for reuse
         
         # Add device controls
         add_device_frame = ctk.CTkFrame(self.multi_target_frame, fg_color="transparent")
@@ -298,7 +406,7 @@ class SyncWaveApp(ctk.CTk):
             command=self.toggle_server,
             width=200,
             height=50,
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=self.font_button,
             fg_color="green",
             hover_color="darkgreen"
         )
@@ -311,14 +419,14 @@ class SyncWaveApp(ctk.CTk):
         ctk.CTkLabel(
             status_frame,
             text="Server Status",
-            font=ctk.CTkFont(size=14, weight="bold")
+            font=self.font_section
         ).pack(pady=5)
         
         self.server_status_label = ctk.CTkLabel(
             status_frame,
             text="● Server Stopped",
             text_color="gray",
-            font=ctk.CTkFont(size=14)
+            font=self.font_body
         )
         self.server_status_label.pack(pady=5)
         
@@ -337,7 +445,7 @@ class SyncWaveApp(ctk.CTk):
         ctk.CTkLabel(
             config_frame,
             text="Receiver Configuration",
-            font=ctk.CTkFont(size=18, weight="bold")
+            font=self.font_heading
         ).pack(pady=10)
         
         # Listen Port
@@ -365,7 +473,7 @@ class SyncWaveApp(ctk.CTk):
         
         self.jitter_label = ctk.CTkLabel(jitter_frame, text="10 packets", width=100)
         self.jitter_label.pack(side="left", padx=5)
-        self.jitter_slider.configure(command=lambda v: self.jitter_label.configure(text=f"{int(v)} packets"))
+        self.jitter_slider.configure(command=self.on_jitter_change)
         
         # Control buttons
         button_frame = ctk.CTkFrame(tab, fg_color="transparent")
@@ -377,7 +485,7 @@ class SyncWaveApp(ctk.CTk):
             command=self.toggle_receiver,
             width=200,
             height=50,
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=self.font_button,
             fg_color="blue",
             hover_color="darkblue"
         )
@@ -391,7 +499,7 @@ class SyncWaveApp(ctk.CTk):
             status_frame,
             text="● Receiver Stopped",
             text_color="gray",
-            font=ctk.CTkFont(size=14)
+            font=self.font_body
         )
         self.receiver_status_label.pack(pady=5)
         
@@ -399,7 +507,7 @@ class SyncWaveApp(ctk.CTk):
         meter_frame = ctk.CTkFrame(status_frame, fg_color="transparent")
         meter_frame.pack(pady=10, fill="x", padx=20)
         
-        ctk.CTkLabel(meter_frame, text="Audio Levels", font=ctk.CTkFont(size=12, weight="bold")).pack()
+        ctk.CTkLabel(meter_frame, text="Audio Levels", font=self.font_small_bold).pack()
         
         level_container = ctk.CTkFrame(meter_frame, fg_color="transparent")
         level_container.pack(pady=5, fill="x")
@@ -416,7 +524,7 @@ class SyncWaveApp(ctk.CTk):
         self.receiver_stats_label = ctk.CTkLabel(
             status_frame,
             text="Waiting for stream...",
-            font=ctk.CTkFont(size=12)
+            font=self.font_small
         )
         self.receiver_stats_label.pack(pady=10)
         
@@ -430,45 +538,47 @@ class SyncWaveApp(ctk.CTk):
         ctk.CTkLabel(
             settings_frame,
             text="Application Settings",
-            font=ctk.CTkFont(size=18, weight="bold")
+            font=self.font_heading
         ).pack(pady=20)
         
         # Audio Devices
         ctk.CTkLabel(
             settings_frame,
             text="Audio Devices",
-            font=ctk.CTkFont(size=14, weight="bold")
+            font=self.font_section
         ).pack(pady=10, anchor="w", padx=20)
         
-        # Get audio devices
-        p = pyaudio.PyAudio()
-        
         # Output devices
         device_frame = ctk.CTkFrame(settings_frame, fg_color="transparent")
         device_frame.pack(pady=5, padx=20, fill="x")
         
         ctk.CTkLabel(device_frame, text="Output Device:", width=150, anchor="w").pack(side="left")
         
-        output_devices = []
-        for i in range(p.get_device_count()):
-            info = p.get_device_info_by_index(i)
-            if info['maxOutputChannels'] > 0:
-                output_devices.append(f"{i}: {info['name'][:50]}")
-        
+        # Populated asynchronously by start_device_scan()
+        self.output_device_keys = {}
+        self._last_output_devices = None
+        self.output_device_var = ctk.StringVar(value="Scanning...")
         self.output_device_menu = ctk.CTkOptionMenu(
             device_frame,
-            values=output_devices if output_devices else ["No devices found"],
+            values=["Scanning..."],
+            variable=self.output_device_var,
             width=500
         )
         self.output_device_menu.pack(side="left", padx=10)
         
-        p.terminate()
+        self.refresh_devices_btn = ctk.CTkButton(
+            device_frame,
+            text="🔄",
+            command=self.refresh_output_devices,
+            width=40
+        )
+        self.refresh_devices_btn.pack(side="left")
         
         # Network Info
         ctk.CTkLabel(
             settings_frame,
             text="Network Information",
-            font=ctk.CTkFont(size=14, weight="bold")
+            font=self.font_section
         ).pack(pady=20, anchor="w", padx=20)
         
         network_frame = ctk.CTkFrame(settings_frame)
@@ -485,7 +595,7 @@ class SyncWaveApp(ctk.CTk):
         ctk.CTkLabel(
             network_frame,
             text=f"Local IP Address: {local_ip}",
-            font=ctk.CTkFont(size=13)
+            font=self.font_info
         ).pack(pady=10)
         
         # Save button
@@ -495,7 +605,7 @@ class SyncWaveApp(ctk.CTk):
             command=self.save_settings,
             width=200,
             height=40,
-            font=ctk.CTkFont(size=14)
+            font=self.font_body
         ).pack(pady=30)
         
     def create_stats_tab(self):
@@ -508,10 +618,10 @@ class SyncWaveApp(ctk.CTk):
         ctk.CTkLabel(
             stats_frame,
             text="Connection Statistics",
-            font=ctk.CTkFont(size=18, weight="bold")
+            font=self.font_heading
         ).pack(pady=20)
         
-        self.stats_text = ctk.CTkTextbox(stats_frame, font=ctk.CTkFont(size=12))
+        self.stats_text = ctk.CTkTextbox(stats_frame, font=self.font_small)
         self.stats_text.pack(pady=10, padx=20, fill="both", expand=True)
         
         self.update_stats_display()
@@ -525,6 +635,7 @@ class SyncWaveApp(ctk.CTk):
         
         self.receiver_port_entry.insert(0, str(self.config["receiver"]["listen_port"]))
         self.jitter_slider.set(self.config["receiver"]["jitter_buffer_size"])
+        self.on_jitter_change(self.config["receiver"]["jitter_buffer_size"])
         
     def save_settings(self):
         """Save current settings"""
@@ -536,12 +647,21 @@ class SyncWaveApp(ctk.CTk):
             
             self.config["receiver"]["listen_port"] = int(self.receiver_port_entry.get())
             self.config["receiver"]["jitter_buffer_size"] = int(self.jitter_slider.get())
+            device_key = self.output_device_keys.get(self.output_device_var.get())
+            if device_key:
+                host_api, name = device_key
+                self.config["receiver"]["output_device"] = {"host_api": host_api, "name": name}
+            # else: scan still pending, keep the saved device
             
             self.save_config()
             messagebox.showinfo("Success", "Settings saved successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save settings: {e}")
     
+    def on_jitter_change(self, value):
+        """Update the jitter buffer label as the slider moves"""
+        self.jitter_label.configure(text=f"{int(value)} packets")
+    
     def on_mode_change(self):
         """Handle streaming mode change"""
         mode = self.server_mode_var.get()
@@ -566,11 +686,9 @@ class SyncWaveApp(ctk.CTk):
             messagebox.showwarning("Input Required", "Please enter both IP and Port")
             return
         
-        try:
-            port = int(port_str)
-            if port < 1 or port > 65535:
-                raise ValueError("Port out of range")
-        except ValueError:
+        # Validate explicitly rather than raising and catching ValueError
+        port = int(port_str) if port_str.isdecimal() else 0
+        if not 1 <= port <= 65535:
             messagebox.showerror("Invalid Port", "Port must be a number between 1-65535")
             return
         
@@ -579,30 +697,14 @@ class SyncWaveApp(ctk.CTk):
             messagebox.showwarning("Duplicate", f"Device {ip}:{port} already added")
             return
         
-        # Add to list
-        self.target_devices.append((ip, port))
-        
-        # Create label with remove button
-        device_frame = ctk.CTkFrame(self.device_list_frame)
+        # Reuse a hidden row if one is available, else create a new one
+        if self._device_row_pool:
+            device_frame = self._device_row_pool.pop()
+        else:
+            device_frame = TargetDeviceRow(self.device_list_frame, self.remove_target_device, self.font_small)
+        device_frame.assign(ip, port)
         device_frame.pack(pady=2, fill="x")
-        
-        label = ctk.CTkLabel(
-            device_frame,
-            text=f"📍 {ip}:{port}",
-            anchor="w",
-            font=ctk.CTkFont(size=12)
-        )
-        label.pack(side="left", padx=5, fill="x", expand=True)
-        
-        remove_btn = ctk.CTkButton(
-            device_frame,
-            text="❌",
-            width=30,
-            command=lambda: self.remove_target_device(ip, port, device_frame)
-        )
-        remove_btn.pack(side="right", padx=5)
-        
-        self.device_labels.append(device_frame)
+        self.target_devices[(ip, port)] = device_frame
         
         # Clear inputs
         self.new_device_ip.delete(0, 'end')
@@ -610,12 +712,13 @@ class SyncWaveApp(ctk.CTk):
         
         self.log_server(f"Added target device: {ip}:{port}")
     
-    def remove_target_device(self, ip, port, frame):
+    def remove_target_device(self, ip, port):
         """Remove a device from the multi-target list"""
-        if (ip, port) in self.target_devices:
-            self.target_devices.remove((ip, port))
-            frame.destroy()
-            self.device_labels.remove(frame)
+        frame = self.target_devices.pop((ip, port), None)
+        if frame is not None:
+            # Hide and recycle instead of destroying the CTk sub-widgets
+            frame.pack_forget()
+            self._device_row_pool.append(frame)
             self.log_server(f"Removed target device: {ip}:{port}")
     
     def on_broadcast_toggle(self):
@@ -687,18 +790,16 @@ class SyncWaveApp(ctk.CTk):
                 
                 self.log_server(f"Starting multi-target server to {len(self.target_devices)} devices")
                 
-                # Create threads for each target
-                self.server_threads = []
                 for ip, port in self.target_devices:
                     self.log_server(f"  → {ip}:{port}")
-                    thread = threading.Thread(
-                        target=self.run_server,
-                        args=(ip, port, use_compression, False),
-                        daemon=True,
-                        name=f"Server-{ip}:{port}"
-                    )
-                    thread.start()
-                    self.server_threads.append(thread)
+                
+                # One capture stream fanned out to every target (not one capture per target)
+                self.server_thread = threading.Thread(
+                    target=self.run_multi_server,
+                    args=(list(self.target_devices), use_compression),
+                    daemon=True
+                )
+                self.server_thread.start()
             
             self.server_running = True
             self.server_button.configure(
@@ -714,6 +815,7 @@ class SyncWaveApp(ctk.CTk):
             # Disable mode selection while running
             self.server_ip_entry.configure(state="disabled")
             self.server_port_entry.configure(state="disabled")
+            self.update_stats_display()
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to start server: {e}")
@@ -721,22 +823,42 @@ class SyncWaveApp(ctk.CTk):
     
     def run_server(self, ip, port, compression, broadcast):
         """Run server in background"""
+        log.debug("Starting audio server to %s:%s (compression=%s, broadcast=%s)", ip, port, compression, broadcast)
         try:
             # This will run in a daemon thread and release Python's GIL
-            syncwave_core.start_audio_server(ip, port, compression, broadcast)
+            syncwave_core.start_audio_server(ip, port, compression, broadcast, self.config["server"].get("buffer_frames"))
         except Exception as e:
-            self.log_server(f"Server error: {e}")
-            self.after(0, lambda: messagebox.showerror("Server Error", str(e)))
+            # Tk is not thread-safe: hand the failure back to the main loop
+            self.after(0, self.on_server_error, threading.current_thread(), str(e))
+    
+    def run_multi_server(self, targets, compression):
+        """Run multi-target server in background"""
+        log.debug("Starting multi-target audio server to %d targets", len(targets))
+        try:
+            syncwave_core.start_audio_server_multi(targets, compression, self.config["server"].get("buffer_frames"))
+        except Exception as e:
+            self.after(0, self.on_server_error, threading.current_thread(), str(e))
+    
+    def on_server_error(self, thread, message):
+        """Report a server thread failure (runs on the Tk thread)"""
+        if thread is not self.server_thread:
+            # A server that was already stopped and replaced; its failure is stale
+            log.debug("Ignoring error from previous server thread: %s", message)
+            return
+        self.log_server(f"Server error: {message}")
+        if self.server_running:
+            self.stop_server()
+        messagebox.showerror("Server Error", message)
     
     def stop_server(self):
         """Stop audio server"""
         self.log_server("Stopping server...")
         self.server_running = False
         
-        # Note: Server thread is daemon and will terminate when app closes
-        # No graceful shutdown mechanism yet - requires Rust refactoring
-        if self.server_thread and self.server_thread.is_alive():
-            self.log_server("⚠ Server thread still running (will stop on app exit)")
+        # Wakes the Rust server, which drops its capture stream and returns
+        syncwave_core.stop_audio_server()
+        # Check back later instead of joining, which would block the Tk main loop
+        self.after(1000, self.check_server_stopped, self.server_thread)
         
         self.server_button.configure(
             text="▶ Start Server",
@@ -750,8 +872,14 @@ class SyncWaveApp(ctk.CTk):
         
         self.server_ip_entry.configure(state="normal")
         self.server_port_entry.configure(state="normal")
+        self.update_stats_display()
         
-        messagebox.showinfo("Info", "Server will stop after current stream ends.")
+        self.log_server("Server stopped")
+    
+    def check_server_stopped(self, thread):
+        """Warn if a stopped server's thread has not exited"""
+        if thread and thread.is_alive():
+            self.log_server("⚠ Server thread still running (will stop on app exit)")
     
     def toggle_receiver(self):
         """Start or stop receiver"""
@@ -784,6 +912,7 @@ class SyncWaveApp(ctk.CTk):
             )
             
             self.receiver_port_entry.configure(state="disabled")
+            self.update_stats_display()
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to start receiver: {e}")
@@ -792,28 +921,40 @@ class SyncWaveApp(ctk.CTk):
         """Run receiver in background"""
         # This is a simplified version - full implementation in receiver_enhanced.py
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.bind(("0.0.0.0", port))
-            
-            self.after(100, lambda: self.receiver_stats_label.configure(
-                text=f"Listening on port {port}..."
-            ))
-            
-            # Simplified receiver loop
-            while self.receiver_running:
-                try:
-                    sock.settimeout(1.0)
-                    data, addr = sock.recvfrom(65536)
-                    # Process data here
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    print(f"Receiver error: {e}")
-                    break
-            
-            sock.close()
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                # A larger receive buffer absorbs network bursts instead of dropping packets
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+                sock.bind(("0.0.0.0", port))
+                
+                # Widgets are only touched from the Tk thread
+                self.after(0, partial(
+                    self.receiver_stats_label.configure,
+                    text=f"Listening on port {port}..."
+                ))
+                
+                # Receive into one preallocated buffer instead of a new bytes object per packet
+                buffer = bytearray(65536)
+                
+                # recvfrom blocks until a packet arrives; the timeout only bounds how long
+                # a stop request waits to be noticed
+                sock.settimeout(1.0)
+                
+                # Simplified receiver loop
+                while self.receiver_running:
+                    try:
+                        nbytes, addr = sock.recvfrom_into(buffer)
+                        # Process buffer[:nbytes] here
+                    except socket.timeout:
+                        continue
         except Exception as e:
-            print(f"Receiver failed: {e}")
+            self.after(0, self.on_receiver_error, str(e))
+    
+    def on_receiver_error(self, message):
+        """Report a receiver thread failure (runs on the Tk thread)"""
+        log.error("Receiver failed: %s", message)
+        if self.receiver_running:
+            self.stop_receiver()
+        self.receiver_stats_label.configure(text=f"Receiver error: {message}")
     
     def stop_receiver(self):
         """Stop audio receiver"""
@@ -830,9 +971,10 @@ class SyncWaveApp(ctk.CTk):
         
         self.receiver_port_entry.configure(state="normal")
         self.receiver_stats_label.configure(text="Receiver stopped")
+        self.update_stats_display()
     
     def update_stats_display(self):
-        """Update statistics display"""
+        """Update statistics display (called whenever server/receiver state changes)"""
         stats_text = f"""
 ╔══════════════════════════════════════════════════════════════╗
 ║                  SyncWave System Statistics                  ║
@@ -850,22 +992,40 @@ Rust Core: {'✅ Available' if RUST_CORE_AVAILABLE else '❌ Not Found'}
         
         self.stats_text.delete("1.0", "end")
         self.stats_text.insert("1.0", stats_text)
-        
-        # Schedule next update
-        self.after(2000, self.update_stats_display)
     
     def on_closing(self):
         """Handle window close"""
         if self.server_running or self.receiver_running:
-            if messagebox.askokcancel("Quit", "Server/Receiver is running. Stop and quit?"):
-                self.server_running = False
-                self.receiver_running = False
-                self.destroy()
-        else:
-            self.destroy()
+            if not messagebox.askokcancel("Quit", "Server/Receiver is running. Stop and quit?"):
+                return
+            if self.server_running:
+                syncwave_core.stop_audio_server()
+            self.server_running = False
+            self.receiver_running = False
+        
+        self._executor.shutdown(wait=False)
+        self.destroy()
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="SyncWave Audio Sync")
+    parser.add_argument("--verbose", action="store_true", help="enable debug logging")
+    args = parser.parse_args()
+    
+    env_level = os.environ.get("SYNCWAVE_LOG_LEVEL", "WARNING").upper()
+    # getLevelName maps known names to ints; anything else would make basicConfig raise
+    valid_level = isinstance(logging.getLevelName(env_level), int)
+    logging.basicConfig(
+        level="DEBUG" if args.verbose else (env_level if valid_level else "WARNING"),
+        format="%(asctime)s %(name)s %(levelname)s: %(message)s"
+    )
+    if not args.verbose and not valid_level:
+        log.warning("Ignoring invalid SYNCWAVE_LOG_LEVEL %r; using WARNING", env_level)
+    
+    # Theme setup is deferred so importing this module stays cheap
+    ctk.set_appearance_mode("dark")
+    ctk.set_default_color_theme("blue")
+    
     app = SyncWaveApp()
     app.mainloop()
 